@@ -179,6 +179,7 @@ def run_evaluation_task(
             batch_size=None,
             shuffle=False,
             num_workers=num_workers,
+            pin_memory=True,
         )
     else:
         dataloader = torch.utils.data.DataLoader(
@@ -187,6 +188,7 @@ def run_evaluation_task(
             shuffle=False,
             num_workers=num_workers,
             collate_fn=collate_fn,
+            pin_memory=True,
         )
 
     if task == 'zeroshot_classification':
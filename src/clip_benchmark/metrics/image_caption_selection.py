@@ -53,7 +53,7 @@ def evaluate(
         b, nim, c, h, w = batch_images.shape
 
         nt = len(batch_texts[0])
-        batch_images = batch_images.to(device)
+        batch_images = batch_images.to(device, non_blocking=True)
         batch_images_ = batch_images.view(b * nim, c, h, w)  # B*nim, C, H, W
 
         # tokenize all texts in the batch
@@ -70,25 +70,24 @@ def evaluate(
                 model.encode_text(batch_texts_tok_), dim=-1
             ).view(b, nt, -1)
 
-        gt = torch.arange(min(nim, nt)).to(device)
+        gt = torch.arange(min(nim, nt), device=device)
 
-        for i in range(b):
-            images_emb = batch_images_emb[i]
-            texts_emb = batch_texts_emb[i]
-            scores = images_emb @ texts_emb.t()
-            image_closest_text = scores.argmax(dim=1)[: len(gt)]
-            text_closest_image = scores.argmax(dim=0)[: len(gt)]
+        # one batched matmul over the whole batch instead of a tiny matmul
+        # and two argmaxes dispatched per instance
+        scores = batch_images_emb @ batch_texts_emb.transpose(1, 2)  # B, nim, nt
+        image_closest_text = scores.argmax(dim=2)[:, : len(gt)]
+        text_closest_image = scores.argmax(dim=1)[:, : len(gt)]
 
-            pred_text_is_correct = (image_closest_text == gt).all().item()
-            pred_image_is_correct = (text_closest_image == gt).all().item()
-            all_correct = pred_text_is_correct and pred_image_is_correct
+        pred_text_is_correct = (image_closest_text == gt).all(dim=1)
+        pred_image_is_correct = (text_closest_image == gt).all(dim=1)
+        all_correct = pred_text_is_correct & pred_image_is_correct
 
-            image_score.append(pred_image_is_correct)
-            text_score.append(pred_text_is_correct)
-            score.append(all_correct)
+        image_score.append(pred_image_is_correct.cpu())
+        text_score.append(pred_text_is_correct.cpu())
+        score.append(all_correct.cpu())
 
     return {
-        'image_acc': torch.Tensor(image_score).float().mean().item(),
-        'text_acc': torch.Tensor(text_score).float().mean().item(),
-        'acc': torch.Tensor(score).float().mean().item(),
+        'image_acc': torch.cat(image_score).float().mean().item(),
+        'text_acc': torch.cat(text_score).float().mean().item(),
+        'acc': torch.cat(score).float().mean().item(),
     }
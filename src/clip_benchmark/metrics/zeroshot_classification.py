@@ -13,7 +13,9 @@ from sklearn.metrics import balanced_accuracy_score, classification_report
 from tqdm import tqdm
 
 
-def _zero_shot_classifier(model, tokenizer, classnames, templates, device, amp=True):
+def _zero_shot_classifier(
+    model, tokenizer, classnames, templates, device, amp=True, num_classes_per_batch=10
+):
     """
     This function returns zero-shot vectors for each class in order
     to use it for zero-shot classification.
@@ -33,24 +35,37 @@ def _zero_shot_classifier(model, tokenizer, classnames, templates, device, amp=T
     of templates, and C is the number of classes.
     """
     autocast = torch.cuda.amp.autocast if amp else suppress
+
+    def _class_texts(classname):
+        if isinstance(templates, dict):
+            # class-specific prompts (e.g., CuPL https://arxiv.org/abs/2209.03320)
+            return templates[classname]
+        elif isinstance(templates, list):
+            # generic prompts tht are specialized for each class by replacing {c}
+            # with the class name
+            return [template.format(c=classname) for template in templates]
+        raise ValueError('templates must be a list or a dict')
+
     with torch.no_grad(), autocast():
         zeroshot_weights = []
-        for classname in tqdm(classnames):
-            if isinstance(templates, dict):
-                # class-specific prompts (e.g., CuPL https://arxiv.org/abs/2209.03320)
-                texts = templates[classname]
-            elif isinstance(templates, list):
-                # generic prompts tht are specialized for each class by replacing {c}
-                # with the class name
-                texts = [template.format(c=classname) for template in templates]
-            else:
-                raise ValueError('templates must be a list or a dict')
-
-            texts = tokenizer(texts).to(device)  # tokenize
-            class_embeddings = model.encode_text(texts)
-            class_embedding = f.normalize(class_embeddings, dim=-1).mean(dim=0)
-            class_embedding /= class_embedding.norm()
-            zeroshot_weights.append(class_embedding)
+        # all prompts are known up front, so the tokenizer runs once over
+        # the whole class list and the loop just slices its output; classes
+        # are encoded several per forward, with per-class prompt counts
+        # kept around for the split (dict templates may vary them)
+        class_texts = [_class_texts(c) for c in classnames]
+        counts = [len(texts) for texts in class_texts]
+        tokens = tokenizer([t for texts in class_texts for t in texts])
+        offset = 0
+        for start in tqdm(range(0, len(classnames), num_classes_per_batch)):
+            batch_counts = counts[start : start + num_classes_per_batch]
+            batch_total = sum(batch_counts)
+            texts = tokens[offset : offset + batch_total].to(device)
+            offset += batch_total
+            class_embeddings = f.normalize(model.encode_text(texts), dim=-1)
+            for class_embedding in class_embeddings.split(batch_counts):
+                class_embedding = class_embedding.mean(dim=0)
+                class_embedding /= class_embedding.norm()
+                zeroshot_weights.append(class_embedding)
 
         zeroshot_weights = torch.stack(zeroshot_weights, dim=1).to(device)
 
@@ -104,8 +119,8 @@ def _run_classification(model, classifier, dataloader, device, amp=True):
     true = []
     with torch.no_grad():
         for images, target in tqdm(dataloader):
-            images = images.to(device)
-            target = target.to(device)
+            images = images.to(device, non_blocking=True)
+            target = target.to(device, non_blocking=True)
 
             with autocast():
                 # predict
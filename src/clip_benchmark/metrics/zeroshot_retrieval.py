@@ -16,41 +16,44 @@ def _dataloader_with_indices(dataloader):
         start = end
 
 
-def _recall_at_k(scores, positive_pairs, k):
+def _recall_at_k(queries, positive_pairs, candidates, k):
     """
     Compute the recall at k for each sample
-    :param scores: compability score between  text and image embeddings
-        (nb texts, nb images)
-    :param k: number of images to consider per text, for retrieval
-    :param positive_pairs: boolean matrix of positive pairs (nb texts, nb images)
-    :return: recall at k averaged over all texts
+    :param queries: embeddings of the query block (nb queries, dim)
+    :param positive_pairs: boolean matrix of positive pairs
+        (nb queries, nb candidates)
+    :param candidates: embeddings of all candidates (nb candidates, dim)
+    :param k: number of candidates to consider per query, for retrieval
+    :return: recall at k averaged over all queries
     """
-    nb_texts, nb_images = scores.shape
-    # for each text, sort according to image scores in decreasing order
+    # embeddings are already normalized, so one on-device matmul scores the
+    # block; the full score matrix is never materialized on CPU
+    scores = queries @ candidates.t()
+    # for each query, sort according to candidate scores in decreasing order
     topk_indices = torch.topk(scores, k, dim=1)[1]
     # compute number of positives for each text
     nb_positive = positive_pairs.sum(dim=1)
-    # nb_texts, k, nb_images
-    topk_indices_onehot = torch.nn.functional.one_hot(
-        topk_indices, num_classes=nb_images
-    )
-    # compute number of true positives
-    positive_pairs_reshaped = positive_pairs.view(nb_texts, 1, nb_images)
-    # a true positive means a positive among the topk
-    nb_true_positive = (topk_indices_onehot * positive_pairs_reshaped).sum(dim=(1, 2))
+    # a true positive means a positive among the topk; gathering the
+    # positive-pair columns at the topk indices avoids materializing a
+    # (nb_texts, k, nb_images) one-hot tensor
+    nb_true_positive = positive_pairs.gather(1, topk_indices).sum(dim=1)
     # compute recall at k
     return nb_true_positive / nb_positive
 
 
 def _batchify(func, x, y, batch_size, device, *args, **kwargs):
-    results = []
+    # results are written straight into a preallocated output instead of
+    # being collected and cat'ed, which would hold a second copy of them
+    results = None
     for start in range(0, len(x), batch_size):
         end = start + batch_size
         _x = x[start:end].to(device)
         _y = y[start:end].to(device)
         result = func(_x, _y, *args, **kwargs).cpu()
-        results.append(result)
-    return torch.cat(results)
+        if results is None:
+            results = torch.empty(len(x), *result.shape[1:], dtype=result.dtype)
+        results[start:end] = result
+    return results
 
 
 def evaluate(
@@ -91,7 +94,7 @@ def evaluate(
     autocast = torch.cuda.amp.autocast if amp else suppress
 
     for batch_images, batch_texts, inds in tqdm(dataloader):
-        batch_images = batch_images.to(device)
+        batch_images = batch_images.to(device, non_blocking=True)
         # tokenize all texts in the batch
         batch_texts_tok = tokenizer(
             [text for i, texts in enumerate(batch_texts) for text in texts]
@@ -117,13 +120,17 @@ def evaluate(
     images_emb = torch.cat(batch_images_emb_list)
     texts_emb = torch.cat(batch_texts_emb_list)
 
-    # get the score for each text and image pair
-    scores = texts_emb @ images_emb.t()
+    # the candidate side of the score matmul lives on-device once; the
+    # query blocks are streamed through _batchify
+    images_emb_device = images_emb.to(device)
+    texts_emb_device = texts_emb.to(device)
 
     # construct a the positive pair matrix, which tells whether each text-image pair
     # is a positive or not
-    positive_pairs = torch.zeros_like(scores, dtype=torch.bool)
-    positive_pairs[torch.arange(len(scores)), texts_image_index] = True
+    positive_pairs = torch.zeros(
+        len(texts_emb), len(images_emb), dtype=torch.bool
+    )
+    positive_pairs[torch.arange(len(texts_emb)), texts_image_index] = True
     metrics = {}
 
     recall_k_list = recall_k_list or [5]
@@ -147,7 +154,13 @@ def evaluate(
         metrics[f'image_retrieval_recall@{recall_k}'] = (
             (
                 _batchify(
-                    _recall_at_k, scores, positive_pairs, batch_size, device, k=recall_k
+                    _recall_at_k,
+                    texts_emb,
+                    positive_pairs,
+                    batch_size,
+                    device,
+                    candidates=images_emb_device,
+                    k=recall_k,
                 )
                 > 0
             )
@@ -159,10 +172,11 @@ def evaluate(
             (
                 _batchify(
                     _recall_at_k,
-                    scores.T,
+                    images_emb,
                     positive_pairs.T,
                     batch_size,
                     device,
+                    candidates=texts_emb_device,
                     k=recall_k,
                 )
                 > 0
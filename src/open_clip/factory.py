@@ -348,6 +348,7 @@ def create_model(
 
 
 def create_loss(args):
+    model_name = args.model.lower()
     if args.distill:
         return DistillClipLoss(
             local_loss=args.local_loss,
@@ -357,7 +358,7 @@ def create_loss(args):
             world_size=args.world_size,
             use_horovod=args.horovod,
         )
-    elif 'coca' in args.model.lower():
+    elif 'coca' in model_name:
         return CoCaLoss(
             caption_loss_weight=args.coca_caption_loss_weight,
             clip_loss_weight=args.coca_contrastive_loss_weight,
@@ -368,7 +369,7 @@ def create_loss(args):
             world_size=args.world_size,
             use_horovod=args.horovod,
         )
-    elif '3towers-text' in args.model.lower():
+    elif '3towers-text' in model_name:
         return ThreeTowersCosEmbeddingLoss(
             mse_loss_weight=args.coca_caption_loss_weight,
             clip_loss_weight=args.coca_contrastive_loss_weight,
@@ -379,7 +380,7 @@ def create_loss(args):
             world_size=args.world_size,
             use_horovod=args.horovod,
         )
-    elif '3towers' in args.model.lower():
+    elif '3towers' in model_name:
         return ThreeTowerLoss(
             local_loss=args.local_loss,
             gather_with_grad=args.gather_with_grad,
@@ -1,3 +1,6 @@
+import functools
+import logging
+
 import torch
 import torch.nn as nn
 from torch.nn import functional as F
@@ -17,6 +20,97 @@ except ImportError:
     hvd = None
 
 
+def _torch_compile(fn):
+    # fuse elementwise + reduction chains when PyTorch >= 2.0 is available.
+    # torch.compile is lazy, so wrapping alone would only surface inductor
+    # failures (CPU-only hosts, missing compiler toolchain) at the first
+    # loss call; keep the eager function as a call-time fallback and drop
+    # to it permanently if the compiled variant fails before it has ever
+    # produced a result
+    if not hasattr(torch, 'compile'):
+        return fn
+
+    compiled = torch.compile(fn)
+    state = {'compiled_ok': False, 'eager': False}
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if state['eager']:
+            return fn(*args, **kwargs)
+        try:
+            result = compiled(*args, **kwargs)
+        except Exception:
+            if state['compiled_ok']:
+                # the compiled graph has run before, so this is a genuine
+                # runtime error, not a backend problem: let it propagate
+                raise
+            logging.warning(
+                f'torch.compile failed for {fn.__name__}, '
+                f'falling back to eager',
+                exc_info=True,
+            )
+            state['eager'] = True
+            return fn(*args, **kwargs)
+        state['compiled_ok'] = True
+        return result
+
+    return wrapper
+
+
+@_torch_compile
+def _distill_loss(teacher_logits, student_logits):
+    return (
+        -(teacher_logits.softmax(dim=1) * student_logits.log_softmax(dim=1))
+        .sum(dim=1)
+        .mean(dim=0)
+    )
+
+
+@_torch_compile
+def _symmetric_cross_entropy(logits):
+    # row- and column-wise cross entropy of a square logits matrix whose
+    # positives sit on the diagonal; fusing both logsumexps lets the kernel
+    # read the logits once instead of two full cross_entropy passes
+    lse_rows = torch.logsumexp(logits, dim=1)
+    lse_cols = torch.logsumexp(logits, dim=0)
+    return (lse_rows.mean() + lse_cols.mean()) / 2 - logits.diagonal().mean()
+
+
+@_torch_compile
+def _siglip_loss(scaled_image_features, text_features, logit_bias, negative_only: bool):
+    # the GEMM and its epilogue live in one compiled graph so Inductor can
+    # fuse the bias add and the softplus/reduction chain into the matmul
+    # tiles instead of round-tripping the N x N logits through HBM;
+    # -logsigmoid(label * logit) == softplus(-label * logit) -- the same
+    # stable form binary_cross_entropy_with_logits fuses internally, minus
+    # its {0, 1} target tensor -- so the loss never materializes the N x N
+    # label matrix either: treat all pairs as negatives, then flip the sign
+    # on the (positive) diagonal
+    if (
+        scaled_image_features.dtype == torch.float32
+        and scaled_image_features.is_cuda
+        and torch.cuda.is_bf16_supported()
+    ):
+        # the GEMM dominates the FLOPs here; bf16 operands roughly double
+        # tensor-core throughput and halve the bandwidth of the feature
+        # reads, while cuBLAS still accumulates in fp32 and the softplus
+        # chain below runs on upcast logits
+        scaled_image_features = scaled_image_features.to(torch.bfloat16)
+        text_features = text_features.to(torch.bfloat16)
+        if logit_bias is not None:
+            logit_bias = logit_bias.to(torch.bfloat16)
+    if logit_bias is not None:
+        logits = torch.addmm(logit_bias, scaled_image_features, text_features.T)
+    else:
+        logits = scaled_image_features @ text_features.T
+    logits = logits.float()
+    loss = F.softplus(logits).sum()
+    if not negative_only:
+        diagonal = logits.diagonal()
+        loss = loss + F.softplus(-diagonal).sum() - F.softplus(diagonal).sum()
+    return loss / logits.shape[0]
+
+
 class GatherFeatures:
 
     def __init__(
@@ -38,6 +132,22 @@ class GatherFeatures:
         )
         if use_horovod:
             assert hvd is not None, 'Please install horovod'
+        # reusable all-gather output; shapes are fixed across training steps,
+        # so the world_size * N * D allocation is paid once
+        self._out_buf = None
+
+    def _output_buffer(self, features: torch.Tensor):
+        shape = (self.world_size * features.shape[0], *features.shape[1:])
+        if (
+            self._out_buf is None
+            or self._out_buf.shape != shape
+            or self._out_buf.dtype != features.dtype
+            or self._out_buf.device != features.device
+        ):
+            self._out_buf = torch.empty(
+                shape, dtype=features.dtype, device=features.device
+            )
+        return self._out_buf
 
     def __call__(self, features: torch.Tensor):
         if self.use_horovod:
@@ -59,17 +169,31 @@ class GatherFeatures:
                     torch.distributed.nn.all_gather(features), dim=0
                 )
             else:
-                gathered_features = [
-                    torch.zeros_like(features) for _ in range(self.world_size)
-                ]
-                dist.all_gather(gathered_features, features)
+                # gather into the cached buffer so NCCL writes each rank's
+                # shard in place, with no per-step allocation
+                all_features = self._output_buffer(features)
+                if hasattr(dist, 'all_gather_into_tensor'):
+                    # single ncclAllGather into contiguous memory, without the
+                    # Python list of per-rank output views
+                    dist.all_gather_into_tensor(all_features, features.contiguous())
+                else:
+                    gathered_features = list(
+                        all_features.chunk(self.world_size, dim=0)
+                    )
+                    dist.all_gather(gathered_features, features)
 
                 if not self.local_loss:
                     # ensure grads for local rank when all_* features don't have
                     # a gradient
-                    gathered_features[self.rank] = features
-
-                all_features = torch.cat(gathered_features, dim=0)
+                    num_local = features.shape[0]
+                    all_features = torch.cat(
+                        [
+                            all_features[: self.rank * num_local],
+                            features,
+                            all_features[(self.rank + 1) * num_local:],
+                        ],
+                        dim=0,
+                    )
 
         return all_features
 
@@ -84,19 +208,34 @@ def gather_features(
     rank=0,
     world_size=1,
     use_horovod=False,
+    gather=None,
 ):
-    gather = GatherFeatures(
-        local_loss=local_loss,
-        gather_with_grad=gather_with_grad,
-        rank=rank,
-        world_size=world_size,
-        use_horovod=use_horovod,
-    )
-    return (
-        gather(image_features),
-        gather(text_features),
-        gather(teacher_features) if teacher_features else None
+    if gather is None:
+        gather = GatherFeatures(
+            local_loss=local_loss,
+            gather_with_grad=gather_with_grad,
+            rank=rank,
+            world_size=world_size,
+            use_horovod=use_horovod,
+        )
+    # pack all modalities into one contiguous tensor so a single collective
+    # replaces two (or three) independent all-gathers
+    features = [image_features, text_features]
+    if teacher_features is not None:
+        features.append(teacher_features)
+    packed = torch.cat(features, dim=0)
+    all_packed = gather(packed)
+    # unpack: gathered layout is (world_size, num_modalities * batch, dim)
+    all_packed = all_packed.reshape(
+        gather.world_size, len(features), image_features.shape[0], -1
     )
+    all_features = [
+        modality.reshape(-1, modality.shape[-1])
+        for modality in all_packed.unbind(dim=1)
+    ]
+    if teacher_features is None:
+        all_features.append(None)
+    return tuple(all_features)
 
 
 class ClipLoss(nn.Module):
@@ -116,26 +255,85 @@ class ClipLoss(nn.Module):
         self.rank = rank
         self.world_size = world_size
         self.use_horovod = use_horovod
+        self._gather = (
+            GatherFeatures(
+                local_loss=local_loss,
+                gather_with_grad=gather_with_grad,
+                rank=rank,
+                world_size=world_size,
+                use_horovod=use_horovod,
+            )
+            if world_size > 1
+            else None
+        )
 
-        # cache state
-        self.prev_num_logits = 0
+        # cache state, keyed by (device, num_logits) so entries stay valid
+        # when the batch size or device changes; labels are tiny, so they are
+        # cached unconditionally regardless of `cache_labels`
         self.labels = {}
 
     def get_ground_truth(self, device, num_logits) -> torch.Tensor:
-        # calculated ground-truth and cache if enabled
-        if self.prev_num_logits != num_logits or device not in self.labels:
+        labels = self.labels.get((device, num_logits))
+        if labels is None:
             labels = torch.arange(num_logits, device=device, dtype=torch.long)
             if self.world_size > 1 and self.local_loss:
                 labels = labels + num_logits * self.rank
-            if self.cache_labels:
-                self.labels[device] = labels
-                self.prev_num_logits = num_logits
-        else:
-            labels = self.labels[device]
+            self.labels[(device, num_logits)] = labels
         return labels
 
+    def _get_logits_overlapped(self, image_features, text_features, logit_scale):
+        # async-TP style overlap for the local-loss path: kick off the packed
+        # all-gather without blocking and compute the self-rank logit blocks
+        # (which only depend on local features) while remote shards arrive
+        num_local = image_features.shape[0]
+        packed = torch.cat([image_features, text_features], dim=0)
+        all_packed = torch.empty(
+            (self.world_size * packed.shape[0], packed.shape[1]),
+            dtype=packed.dtype,
+            device=packed.device,
+        )
+        gathered = list(all_packed.chunk(self.world_size, dim=0))
+        work = dist.all_gather(gathered, packed, async_op=True)
+
+        scaled_image = logit_scale * image_features
+        scaled_text = logit_scale * text_features
+        # detach the key operand to keep local-loss gradient semantics
+        # identical to the gathered (grad-free) shards
+        self_logits_image = scaled_image @ text_features.detach().T
+        self_logits_text = scaled_text @ image_features.detach().T
+        work.wait()
+
+        all_packed = all_packed.reshape(self.world_size, 2, num_local, -1)
+        left, right = all_packed[: self.rank], all_packed[self.rank + 1:]
+        dim = all_packed.shape[-1]
+        logits_per_image = torch.cat(
+            [
+                scaled_image @ left[:, 1].reshape(-1, dim).T,
+                self_logits_image,
+                scaled_image @ right[:, 1].reshape(-1, dim).T,
+            ],
+            dim=1,
+        )
+        logits_per_text = torch.cat(
+            [
+                scaled_text @ left[:, 0].reshape(-1, dim).T,
+                self_logits_text,
+                scaled_text @ right[:, 0].reshape(-1, dim).T,
+            ],
+            dim=1,
+        )
+        return logits_per_image, logits_per_text
+
     def get_logits(self, image_features, text_features, logit_scale):
         if self.world_size > 1:
+            if (
+                self.local_loss
+                and not self.gather_with_grad
+                and not self.use_horovod
+            ):
+                return self._get_logits_overlapped(
+                    image_features, text_features, logit_scale
+                )
             all_image_features, all_text_features, _ = gather_features(
                 image_features=image_features,
                 text_features=text_features,
@@ -144,18 +342,19 @@ class ClipLoss(nn.Module):
                 rank=self.rank,
                 world_size=self.world_size,
                 use_horovod=self.use_horovod,
+                gather=self._gather,
             )
             if self.local_loss:
-                logits_per_image = logit_scale * image_features @ all_text_features.T
-                logits_per_text = logit_scale * text_features @ all_image_features.T
+                logits_per_image = (logit_scale * image_features) @ all_text_features.T
+                logits_per_text = (logit_scale * text_features) @ all_image_features.T
             else:
                 logits_per_image = (
-                    logit_scale * all_image_features @ all_text_features.T
+                    (logit_scale * all_image_features) @ all_text_features.T
                 )
                 logits_per_text = logits_per_image.T
         else:
-            logits_per_image = logit_scale * image_features @ text_features.T
-            logits_per_text = logit_scale * text_features @ image_features.T
+            logits_per_image = (logit_scale * image_features) @ text_features.T
+            logits_per_text = logits_per_image.T
 
         return logits_per_image, logits_per_text
 
@@ -167,10 +366,15 @@ class ClipLoss(nn.Module):
 
         labels = self.get_ground_truth(device, logits_per_image.shape[0])
 
-        total_loss = (
-            F.cross_entropy(logits_per_image, labels)
-            + F.cross_entropy(logits_per_text, labels)
-        ) / 2
+        if self.world_size > 1 and self.local_loss:
+            total_loss = (
+                F.cross_entropy(logits_per_image, labels)
+                + F.cross_entropy(logits_per_text, labels)
+            ) / 2
+        else:
+            # logits_per_text is a transposed view here, so one fused kernel
+            # reduces rows and columns of the single contiguous tensor
+            total_loss = _symmetric_cross_entropy(logits_per_image)
 
         return {'contrastive_loss': total_loss} if output_dict else total_loss
 
@@ -200,6 +404,24 @@ class ThreeTowersCosEmbeddingLoss(ClipLoss):
         self.clip_loss_weight = clip_loss_weight
         self.mse_loss_weight = mse_loss_weight
         self.mse_loss = nn.CosineEmbeddingLoss()
+        # target is all ones; cache it instead of re-allocating (and copying
+        # to a hard-coded cuda device) every step
+        self._target = None
+
+    def _get_target(self, teacher_features):
+        num = teacher_features.shape[0]
+        if (
+            self._target is None
+            or self._target.shape[0] < num
+            or self._target.device != teacher_features.device
+            or self._target.dtype != teacher_features.dtype
+        ):
+            self._target = torch.ones(
+                num,
+                device=teacher_features.device,
+                dtype=teacher_features.dtype,
+            )
+        return self._target[:num]
 
     def forward(
         self,
@@ -210,7 +432,7 @@ class ThreeTowersCosEmbeddingLoss(ClipLoss):
         output_dict=False,
     ):
         clip_loss = torch.tensor(0)
-        target = torch.ones(teacher_features.shape[0]).to(torch.device('cuda'))
+        target = self._get_target(teacher_features)
         if self.clip_loss_weight:
             clip_loss = super().forward(image_features, text_features, logit_scale)
             clip_loss = self.clip_loss_weight * clip_loss
@@ -241,22 +463,30 @@ class ThreeTowerLoss(nn.Module):
         self.rank = rank
         self.world_size = world_size
         self.use_horovod = use_horovod
+        self._gather = (
+            GatherFeatures(
+                local_loss=local_loss,
+                gather_with_grad=gather_with_grad,
+                rank=rank,
+                world_size=world_size,
+                use_horovod=use_horovod,
+            )
+            if world_size > 1
+            else None
+        )
 
-        # cache state
-        self.prev_num_logits = 0
+        # cache state, keyed by (device, num_logits) so entries stay valid
+        # when the batch size or device changes; labels are tiny, so they are
+        # cached unconditionally regardless of `cache_labels`
         self.labels = {}
 
     def get_ground_truth(self, device, num_logits) -> torch.Tensor:
-        # calculated ground-truth and cache if enabled
-        if self.prev_num_logits != num_logits or device not in self.labels:
+        labels = self.labels.get((device, num_logits))
+        if labels is None:
             labels = torch.arange(num_logits, device=device, dtype=torch.long)
             if self.world_size > 1 and self.local_loss:
                 labels = labels + num_logits * self.rank
-            if self.cache_labels:
-                self.labels[device] = labels
-                self.prev_num_logits = num_logits
-        else:
-            labels = self.labels[device]
+            self.labels[(device, num_logits)] = labels
         return labels
 
     def get_logits(self, image_features, text_features, teacher_features, logit_scale):
@@ -275,26 +505,27 @@ class ThreeTowerLoss(nn.Module):
                 self.rank,
                 self.world_size,
                 self.use_horovod,
+                gather=self._gather,
             )
             if self.local_loss:
-                logits['image']['text'] = (
-                    logit_scale * image_features @ all_text_features.T
-                )
-                logits['text']['image'] = (
-                    logit_scale * text_features @ all_image_features.T
-                )
-                logits['image']['teacher'] = (
-                    logit_scale * image_features @ all_teacher_features.T
-                )
-                logits['teacher']['image'] = (
-                    logit_scale * teacher_features @ all_image_features.T
-                )
-                logits['text']['teacher'] = (
-                    logit_scale * text_features @ all_teacher_features.T
-                )
-                logits['teacher']['text'] = (
-                    logit_scale * teacher_features @ all_text_features.T
-                )
+                # one matmul per query modality against the concatenated keys
+                # of the other two, then split: three GEMMs instead of six
+                num_all = all_image_features.shape[0]
+                image_logits = (logit_scale * image_features) @ torch.cat(
+                    [all_text_features, all_teacher_features], dim=0
+                ).T
+                logits['image']['text'] = image_logits[:, :num_all]
+                logits['image']['teacher'] = image_logits[:, num_all:]
+                text_logits = (logit_scale * text_features) @ torch.cat(
+                    [all_image_features, all_teacher_features], dim=0
+                ).T
+                logits['text']['image'] = text_logits[:, :num_all]
+                logits['text']['teacher'] = text_logits[:, num_all:]
+                teacher_logits = (logit_scale * teacher_features) @ torch.cat(
+                    [all_image_features, all_text_features], dim=0
+                ).T
+                logits['teacher']['image'] = teacher_logits[:, :num_all]
+                logits['teacher']['text'] = teacher_logits[:, num_all:]
             else:
                 logits['image']['text'] = (
                     logit_scale * all_image_features @ all_text_features.T
@@ -309,16 +540,14 @@ class ThreeTowerLoss(nn.Module):
                 )
                 logits['teacher']['text'] = logits['text']['teacher'].T
         else:
-            logits['image']['text'] = logit_scale * image_features @ text_features.T
-            logits['text']['image'] = logit_scale * text_features @ image_features.T
+            logits['image']['text'] = (logit_scale * image_features) @ text_features.T
+            logits['text']['image'] = logits['image']['text'].T
             logits['image']['teacher'] = (
-                logit_scale * image_features @ teacher_features.T
-            )
-            logits['teacher']['image'] = (
-                logit_scale * teacher_features @ image_features.T
+                (logit_scale * image_features) @ teacher_features.T
             )
-            logits['text']['teacher'] = logit_scale * text_features @ teacher_features.T
-            logits['teacher']['text'] = logit_scale * teacher_features @ text_features.T
+            logits['teacher']['image'] = logits['image']['teacher'].T
+            logits['text']['teacher'] = (logit_scale * text_features) @ teacher_features.T
+            logits['teacher']['text'] = logits['text']['teacher'].T
 
         return logits
 
@@ -384,9 +613,12 @@ class CoCaLoss(ClipLoss):
             clip_loss = super().forward(image_features, text_features, logit_scale)
             clip_loss = self.clip_loss_weight * clip_loss
 
+        # flatten to 2D instead of permuting to (B, V, T): cross_entropy on
+        # the permuted view would materialize a contiguous copy of the
+        # vocab-sized logits, the largest tensor in this module
         caption_loss = self.caption_loss(
-            logits.permute(0, 2, 1),
-            labels,
+            logits.reshape(-1, logits.shape[-1]),
+            labels.reshape(-1),
         )
         caption_loss = caption_loss * self.caption_loss_weight
 
@@ -398,11 +630,7 @@ class CoCaLoss(ClipLoss):
 
 class DistillClipLoss(ClipLoss):
     def dist_loss(self, teacher_logits, student_logits):
-        return (
-            -(teacher_logits.softmax(dim=1) * student_logits.log_softmax(dim=1))
-            .sum(dim=1)
-            .mean(dim=0)
-        )
+        return _distill_loss(teacher_logits, student_logits)
 
     def forward(
         self,
@@ -440,8 +668,58 @@ class DistillClipLoss(ClipLoss):
         return contrastive_loss, distill_loss
 
 
-def neighbour_exchange(from_rank, to_rank, tensor, group=None):
-    tensor_recv = torch.zeros_like(tensor)
+class AllGatherWithGrad(torch.autograd.Function):
+    # contiguous all_gather whose backward reduce-scatters the incoming
+    # gradient, so each rank receives only its own shard's grad instead of
+    # slicing a full all_reduce'd matrix
+
+    @staticmethod
+    def forward(ctx, tensor):
+        world_size = dist.get_world_size()
+        ctx.num_local = tensor.shape[0]
+        output = torch.empty(
+            (world_size * tensor.shape[0], *tensor.shape[1:]),
+            dtype=tensor.dtype,
+            device=tensor.device,
+        )
+        dist.all_gather_into_tensor(output, tensor.contiguous())
+        return output
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        grad_input = torch.empty(
+            (ctx.num_local, *grad_output.shape[1:]),
+            dtype=grad_output.dtype,
+            device=grad_output.device,
+        )
+        dist.reduce_scatter_tensor(grad_input, grad_output.contiguous())
+        return grad_input
+
+
+# fallback receive buffers for exchanges whose caller does not manage its
+# own (the autograd backward hops); four slots per key are handed out
+# round-robin, so a tensor received in one hop is never the receive target
+# again until three further exchanges have been posted -- by then every op
+# reading it has been enqueued and ProcessGroupNCCL's stream sync makes the
+# next irecv wait on them
+_neighbour_recv_pool = {}
+
+
+def _recv_buffer(reference):
+    key = (tuple(reference.shape), reference.dtype, reference.device)
+    index, buffers = _neighbour_recv_pool.get(key, (0, [None] * 4))
+    buf = buffers[index]
+    if buf is None:
+        # NCCL fully overwrites the receive buffer, so skip the zero-fill
+        buf = torch.empty_like(reference)
+        buffers[index] = buf
+    _neighbour_recv_pool[key] = ((index + 1) % len(buffers), buffers)
+    return buf
+
+
+def neighbour_exchange(from_rank, to_rank, tensor, group=None, tensor_recv=None):
+    if tensor_recv is None:
+        tensor_recv = _recv_buffer(tensor)
     send_op = torch.distributed.P2POp(
         torch.distributed.isend,
         tensor,
@@ -461,86 +739,103 @@ def neighbour_exchange(from_rank, to_rank, tensor, group=None):
 
 
 def neighbour_exchange_bidir(
-    left_rank, right_rank, tensor_to_left, tensor_to_right, group=None
+    left_rank, right_rank, tensor_to_left, tensor_to_right, group=None, buffers=None
 ):
-    tensor_from_left = torch.zeros_like(tensor_to_right)
-    tensor_from_right = torch.zeros_like(tensor_to_left)
-    send_op_left = torch.distributed.P2POp(
-        torch.distributed.isend,
-        tensor_to_left,
-        left_rank,
-        group=group,
-    )
-    send_op_right = torch.distributed.P2POp(
-        torch.distributed.isend,
-        tensor_to_right,
-        right_rank,
-        group=group,
-    )
-    recv_op_left = torch.distributed.P2POp(
-        torch.distributed.irecv,
-        tensor_from_left,
-        left_rank,
-        group=group,
-    )
-    recv_op_right = torch.distributed.P2POp(
-        torch.distributed.irecv,
-        tensor_from_right,
-        right_rank,
-        group=group,
-    )
-    reqs = torch.distributed.batch_isend_irecv(
-        [send_op_right, send_op_left, recv_op_right, recv_op_left]
-    )
+    if buffers is not None:
+        tensor_from_left, tensor_from_right = buffers
+    else:
+        tensor_from_left = _recv_buffer(tensor_to_right)
+        tensor_from_right = _recv_buffer(tensor_to_left)
+    # all four ops must go through one batch_isend_irecv: the grouped call
+    # wraps them in ncclGroupStart/End, which NCCL needs to pair each send
+    # with the matching recv. Posted standalone, every rank enqueues both
+    # sends before both recvs, and the rendezvous send kernel on each
+    # neighbour pair spins on a peer recv that is queued behind the peer's
+    # own blocked send -- a circular wait on every adjacent pair for
+    # world_size >= 3
+    ops = [
+        torch.distributed.P2POp(
+            torch.distributed.isend, tensor_to_right, right_rank, group=group
+        ),
+        torch.distributed.P2POp(
+            torch.distributed.isend, tensor_to_left, left_rank, group=group
+        ),
+        torch.distributed.P2POp(
+            torch.distributed.irecv, tensor_from_right, right_rank, group=group
+        ),
+        torch.distributed.P2POp(
+            torch.distributed.irecv, tensor_from_left, left_rank, group=group
+        ),
+    ]
+    reqs = torch.distributed.batch_isend_irecv(ops)
     for req in reqs:
         req.wait()
     return tensor_from_right, tensor_from_left
 
 
 class NeighbourExchange(torch.autograd.Function):
+    # receive buffers travel inside a tuple so autograd does not treat them
+    # as differentiable inputs that alias the output
     @staticmethod
-    def forward(ctx, from_rank, to_rank, group, tensor):
+    def forward(ctx, from_rank, to_rank, group, buffers, tensor):
         ctx.group = group
         ctx.from_rank = from_rank
         ctx.to_rank = to_rank
-        return neighbour_exchange(from_rank, to_rank, tensor, group=group)
+        tensor_recv = buffers[0] if buffers is not None else None
+        return neighbour_exchange(
+            from_rank, to_rank, tensor, group=group, tensor_recv=tensor_recv
+        )
 
     @staticmethod
     def backward(ctx, grad_output):
-        return (None, None, None) + (
-            NeighbourExchange.apply(ctx.to_rank, ctx.from_rank, ctx.group, grad_output),
+        return (None, None, None, None) + (
+            NeighbourExchange.apply(
+                ctx.to_rank, ctx.from_rank, ctx.group, None, grad_output
+            ),
         )
 
 
-def neighbour_exchange_with_grad(from_rank, to_rank, tensor, group=None):
-    return NeighbourExchange.apply(from_rank, to_rank, group, tensor)
+def neighbour_exchange_with_grad(from_rank, to_rank, tensor, group=None, buffers=None):
+    return NeighbourExchange.apply(from_rank, to_rank, group, buffers, tensor)
 
 
 class NeighbourExchangeBidir(torch.autograd.Function):
     @staticmethod
-    def forward(ctx, left_rank, right_rank, group, tensor_to_left, tensor_to_right):
+    def forward(
+        ctx, left_rank, right_rank, group, buffers, tensor_to_left, tensor_to_right
+    ):
         ctx.group = group
         ctx.left_rank = left_rank
         ctx.right_rank = right_rank
         return neighbour_exchange_bidir(
-            left_rank, right_rank, tensor_to_left, tensor_to_right, group=group
+            left_rank,
+            right_rank,
+            tensor_to_left,
+            tensor_to_right,
+            group=group,
+            buffers=buffers,
         )
 
     @staticmethod
     def backward(ctx, *grad_outputs):
-        return (None, None, None) + NeighbourExchangeBidir.apply(
-            ctx.right_rank, ctx.left_rank, ctx.group, *grad_outputs
+        return (None, None, None, None) + NeighbourExchangeBidir.apply(
+            ctx.right_rank, ctx.left_rank, ctx.group, None, *grad_outputs
         )
 
 
 def neighbour_exchange_bidir_with_grad(
-    left_rank, right_rank, tensor_to_left, tensor_to_right, group=None
+    left_rank, right_rank, tensor_to_left, tensor_to_right, group=None, buffers=None
 ):
     return NeighbourExchangeBidir.apply(
-        left_rank, right_rank, group, tensor_to_left, tensor_to_right
+        left_rank, right_rank, group, buffers, tensor_to_left, tensor_to_right
     )
 
 
+# upper bound on resident exchanged-shard elements before the batched
+# negative-loss path falls back to streaming per-shard losses
+_SIGLIP_BATCH_NEGATIVES_MAX_ELEMENTS = 2 ** 27
+
+
 class SigLipLoss(nn.Module):
     """Sigmoid Loss for Language Image Pre-Training (SigLIP) -
     https://arxiv.org/abs/2303.15343
@@ -560,6 +855,7 @@ class SigLipLoss(nn.Module):
         world_size=1,
         bidir=True,
         use_horovod=False,
+        single_gather=False,
     ):
         super().__init__()
         self.cache_labels = cache_labels
@@ -568,24 +864,58 @@ class SigLipLoss(nn.Module):
         assert not use_horovod  # FIXME need to look at hvd ops for ring transfers
         self.use_horovod = use_horovod
         self.bidir = bidir
+        # trade the W-1 ring hops for one all-gather + one wide GEMM; the
+        # ring stays the default for bandwidth-constrained clusters where its
+        # O(N*D) message size beats O(W*N*D)
+        self.single_gather = single_gather
 
-        # cache state FIXME cache not currently used, worthwhile?
-        self.prev_num_logits = 0
+        # label matrices, keyed by (device, dtype, num_logits, negative_only);
+        # shapes are fixed across steps so each variant is built exactly once
         self.labels = {}
+        # double-buffered receive tensors for the ring exchange; shapes are
+        # fixed across steps, so the allocations are paid only once
+        self._recv_buffers = {}
+
+    def _ring_buffers(self, reference, index):
+        key = (
+            index,
+            tuple(reference.shape),
+            reference.dtype,
+            reference.device,
+        )
+        buffers = self._recv_buffers.get(key)
+        if buffers is None:
+            buffers = (torch.empty_like(reference), torch.empty_like(reference))
+            self._recv_buffers[key] = buffers
+        return buffers
 
     def get_ground_truth(
         self, device, dtype, num_logits, negative_only=False
     ) -> torch.Tensor:
-        labels = -torch.ones((num_logits, num_logits), device=device, dtype=dtype)
-        if not negative_only:
-            labels = 2 * torch.eye(num_logits, device=device, dtype=dtype) + labels
+        # labels are pure {-1, +1} sign metadata, so int8 is enough: 4x less
+        # bandwidth than fp32 whenever a caller multiplies them with logits
+        # (the hot path in _loss no longer materializes them at all); `dtype`
+        # is kept in the signature for callers that want a wider dtype
+        key = (device, dtype, num_logits, negative_only)
+        labels = self.labels.get(key)
+        if labels is None:
+            labels = -torch.ones(
+                (num_logits, num_logits), device=device, dtype=torch.int8
+            )
+            if not negative_only:
+                labels.fill_diagonal_(1)
+            if dtype is not None and dtype != torch.int8:
+                labels = labels.to(dtype)
+            self.labels[key] = labels
         return labels
 
     def get_logits(self, image_features, text_features, logit_scale, logit_bias=None):
-        logits = logit_scale * image_features @ text_features.T
+        # fold the scale into the small (N x D) operand and the bias into the
+        # GEMM epilogue via addmm, avoiding a separate N x N add kernel
+        scaled_image_features = logit_scale * image_features
         if logit_bias is not None:
-            logits += logit_bias
-        return logits
+            return torch.addmm(logit_bias, scaled_image_features, text_features.T)
+        return scaled_image_features @ text_features.T
 
     def _loss(
         self,
@@ -595,72 +925,161 @@ class SigLipLoss(nn.Module):
         logit_bias=None,
         negative_only=False,
     ):
-        logits = self.get_logits(image_features, text_features, logit_scale, logit_bias)
-        labels = self.get_ground_truth(
-            image_features.device,
-            image_features.dtype,
-            image_features.shape[0],
-            negative_only=negative_only,
+        return _siglip_loss(
+            logit_scale * image_features, text_features, logit_bias, negative_only
+        )
+
+    def _batched_negative_loss(self, scaled_image_features, text_shards, logit_bias):
+        # one batched GEMM + reduction over all received shards instead of
+        # world_size - 1 separate matmul and softplus launches
+        stacked = torch.stack(text_shards, dim=0)
+        if stacked.dtype != scaled_image_features.dtype:
+            scaled_image_features = scaled_image_features.to(stacked.dtype)
+        logits = scaled_image_features @ stacked.transpose(1, 2)
+        if logit_bias is not None:
+            logits = logits + logit_bias
+        return F.softplus(logits.float()).sum() / scaled_image_features.shape[0]
+
+    def _single_gather_loss(
+        self, image_features, text_features, logit_scale, logit_bias
+    ):
+        # one collective latency and one N x (W*N) GEMM replace the W-1
+        # sequential neighbour exchanges and their per-shard GEMMs
+        if hasattr(dist, 'all_gather_into_tensor') and hasattr(
+            dist, 'reduce_scatter_tensor'
+        ):
+            all_text_features = AllGatherWithGrad.apply(text_features)
+        else:
+            all_text_features = torch.cat(
+                torch.distributed.nn.all_gather(text_features), dim=0
+            )
+        logits = self.get_logits(
+            image_features, all_text_features, logit_scale, logit_bias
+        )
+        # positives sit on the diagonal of this rank's column block
+        diagonal = logits.diagonal(offset=self.rank * image_features.shape[0])
+        loss = (
+            F.softplus(logits).sum()
+            + F.softplus(-diagonal).sum()
+            - F.softplus(diagonal).sum()
         )
-        loss = -F.logsigmoid(labels * logits).sum() / image_features.shape[0]
-        return loss
+        return loss / image_features.shape[0]
 
     def forward(
         self, image_features, text_features, logit_scale, logit_bias, output_dict=False
     ):
-        loss = self._loss(image_features, text_features, logit_scale, logit_bias)
+        if self.world_size > 1 and self.single_gather:
+            loss = self._single_gather_loss(
+                image_features, text_features, logit_scale, logit_bias
+            )
+            return {'contrastive_loss': loss} if output_dict else loss
+
+        # the scale is folded into the image features once; every shard GEMM
+        # in the ring below reuses the scaled operand unchanged
+        scaled_image_features = logit_scale * image_features
+        loss = _siglip_loss(
+            scaled_image_features, text_features, logit_bias, negative_only=False
+        )
 
         if self.world_size > 1:
             # exchange text features w/ neighbour world_size - 1 times
             right_rank = (self.rank + 1) % self.world_size
             left_rank = (self.rank - 1 + self.world_size) % self.world_size
+            if (
+                text_features.dtype == torch.float32
+                and text_features.is_cuda
+                and torch.cuda.is_bf16_supported()
+            ):
+                # the ring is bandwidth-bound, so shipping the exchanged
+                # features in bf16 halves the NCCL bytes per hop (and the
+                # receive buffers); the GEMMs consume bf16 anyway and the
+                # cast node upcasts the gradients back to fp32
+                text_features = text_features.to(torch.bfloat16)
+            # batching defers the negative losses until every shard arrived,
+            # so all shards stay resident: only do it when they fit comfortably
+            batch_negatives = (
+                (self.world_size - 1) * text_features.numel()
+                <= _SIGLIP_BATCH_NEGATIVES_MAX_ELEMENTS
+            )
+            received = []
+
+            def shard_loss(shard):
+                if batch_negatives:
+                    received.append(shard)
+                    return 0.0
+                return _siglip_loss(
+                    scaled_image_features, shard, logit_bias, negative_only=True
+                )
+
+            def ring_buffers(index):
+                # every hop gets its own slots: autograd saves each received
+                # shard for the GEMM backward, so a buffer must not be
+                # re-targeted by a later irecv before backward() has run
+                # (dist writes bypass version counters and would corrupt the
+                # saved activation silently). Buffers still persist across
+                # steps, so the allocations are paid only once
+                return self._ring_buffers(text_features, index)
+
+            # the ring is software-pipelined: each hop is posted as soon as
+            # its inputs (the previous hop's received shards) exist and the
+            # previous shards are only scored afterwards, so NCCL moves hop
+            # i + 1 on its own stream while the GEMMs score hop i
             if self.bidir:
-                text_features_to_right = text_features_to_left = text_features
+                to_left = to_right = text_features
+                prev_recv = None
                 num_bidir, remainder = divmod(self.world_size - 1, 2)
                 for i in range(num_bidir):
                     text_features_recv = neighbour_exchange_bidir_with_grad(
                         left_rank,
                         right_rank,
-                        text_features_to_left,
-                        text_features_to_right,
+                        to_left,
+                        to_right,
+                        buffers=ring_buffers(i),
                     )
 
-                    for f in text_features_recv:
-                        loss += self._loss(
-                            image_features,
-                            f,
-                            logit_scale,
-                            logit_bias,
-                            negative_only=True,
-                        )
-                    text_features_to_left, text_features_to_right = text_features_recv
+                    if prev_recv is not None:
+                        for f in prev_recv:
+                            loss += shard_loss(f)
+                    to_left, to_right = text_features_recv
+                    prev_recv = text_features_recv
 
                 if remainder:
-                    text_features_recv = neighbour_exchange_with_grad(
-                        left_rank, right_rank, text_features_to_right
-                    )
-
-                    loss += self._loss(
-                        image_features,
-                        text_features_recv,
-                        logit_scale,
-                        logit_bias,
-                        negative_only=True,
+                    single_recv = neighbour_exchange_with_grad(
+                        left_rank,
+                        right_rank,
+                        to_right,
+                        buffers=ring_buffers(num_bidir),
                     )
+                else:
+                    single_recv = None
+
+                if prev_recv is not None:
+                    for f in prev_recv:
+                        loss += shard_loss(f)
+                if single_recv is not None:
+                    loss += shard_loss(single_recv)
             else:
-                text_features_to_right = text_features
+                to_right = text_features
+                prev_recv = None
                 for i in range(self.world_size - 1):
                     text_features_from_left = neighbour_exchange_with_grad(
-                        left_rank, right_rank, text_features_to_right
+                        left_rank,
+                        right_rank,
+                        to_right,
+                        buffers=ring_buffers(i),
                     )
 
-                    loss += self._loss(
-                        image_features,
-                        text_features_from_left,
-                        logit_scale,
-                        logit_bias,
-                        negative_only=True,
-                    )
-                    text_features_to_right = text_features_from_left
+                    if prev_recv is not None:
+                        loss += shard_loss(prev_recv)
+                    to_right = text_features_from_left
+                    prev_recv = text_features_from_left
+
+                if prev_recv is not None:
+                    loss += shard_loss(prev_recv)
+
+            if received:
+                loss = loss + self._batched_negative_loss(
+                    scaled_image_features, received, logit_bias
+                )
 
         return {'contrastive_loss': loss} if output_dict else loss
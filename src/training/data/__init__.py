@@ -1,3 +1,6 @@
-from training.data.embeddings.collate import dynamic_collate  # noqa: F401
+from training.data.embeddings.collate import (  # noqa: F401
+    DynamicCollate,
+    dynamic_collate,
+)
 from training.data.embeddings.dataset import MultiS3EmbeddingDataset  # noqa: F401
 from training.data.multimodal.data import get_multimodal_data  # noqa: F401
@@ -8,6 +8,31 @@ from training.data.embeddings.utils import lookahead
 from training.embloss import InputType
 
 
+class DynamicCollate:
+    """Picklable collate callable with the tokenizer settings baked in.
+
+    Compared to a ``functools.partial`` over :func:`dynamic_collate`, the
+    fixed arguments live in slots instead of a keyword dict that gets
+    rebuilt on every batch and re-pickled on every DataLoader worker
+    start.
+    """
+
+    __slots__ = ('tokenizer', 'tokenizer_options', 'input_type_dict')
+
+    def __init__(self, tokenizer, tokenizer_options, input_type_dict):
+        self.tokenizer = tokenizer
+        self.tokenizer_options = tokenizer_options
+        self.input_type_dict = input_type_dict
+
+    def __call__(self, batch):
+        return dynamic_collate(
+            batch,
+            tokenizer=self.tokenizer,
+            tokenizer_options=self.tokenizer_options,
+            input_type_dict=self.input_type_dict,
+        )
+
+
 @lookahead
 def dynamic_collate(
     batch: tuple[
@@ -253,12 +253,10 @@ def _list_to_tuple(data):
     return data
 
 
-def _path_to_dir(pth: str) -> str:
-    return '/'.join(pth.split('/')[:-1])
-
-
-def _path_to_name(pth: str) -> str:
-    return pth.split('/')[-1]
+def _split_path(pth: str) -> Tuple[str, str]:
+    """Split a dataset path into its directory and name in a single pass."""
+    directory, _, name = pth.rpartition('/')
+    return directory, name
 
 
 class MultiS3EmbeddingDataset(IterableDataset):
@@ -326,28 +324,29 @@ class MultiS3EmbeddingDataset(IterableDataset):
                     for folder in get_directories(dset_parent_dir)
                 ]
 
+        self._datasets = {}
         if isinstance(datasets, list):
-            self._datasets = {
-                ds_path: S3EmbeddingDataset(
+            for ds_path in datasets:
+                directory, name = _split_path(ds_path)
+                self._datasets[ds_path] = S3EmbeddingDataset(
                     bucket,
-                    _path_to_name(ds_path),
+                    name,
                     input_type_dict=input_type_dict,
                     task_type=self._task_types.get(ds_path),
-                    directory=_path_to_dir(ds_path),
+                    directory=directory,
                     max_shards=max_shards,
                     world_size=world_size,
                     global_rank=global_rank,
                     dialect=dialect,
                     interleaved=synchronous,
                 )
-                for ds_path in datasets
-            }
         else:
-            self._datasets = {
-                ds_path: S3EmbeddingDataset(
+            for ds_path, dataset in datasets.items():
+                directory, name = _split_path(ds_path)
+                self._datasets[ds_path] = S3EmbeddingDataset(
                     bucket=bucket,
-                    dataset=_path_to_name(ds_path),
-                    directory=_path_to_dir(ds_path),
+                    dataset=name,
+                    directory=directory,
                     interleaved=synchronous,
                     input_type_dict=input_type_dict,
                     task_type=self._task_types.get(ds_path),
@@ -363,8 +362,6 @@ class MultiS3EmbeddingDataset(IterableDataset):
                         else {}
                     ),
                 )
-                for ds_path, dataset in datasets.items()
-            }
         self._sampling_rates = {
             ds_path: len(dataset) for ds_path, dataset in self._datasets.items()
         }
@@ -437,10 +434,11 @@ class MultiS3EmbeddingDataset(IterableDataset):
         return self._max_batches * self._batch_size
 
     def rebuild_dataset(self, dataset: str):
+        directory, name = _split_path(dataset)
         return S3EmbeddingDataset(
             bucket=self._bucket,
-            dataset=_path_to_name(dataset),
-            directory=_path_to_dir(dataset),
+            dataset=name,
+            directory=directory,
             world_size=self._world_size,
             global_rank=self._global_rank,
             max_shards=self._datasets[dataset]._max_shards,
@@ -0,0 +1,52 @@
+import hashlib
+import logging
+import os
+import re
+
+import numpy as np
+import torch
+
+
+def _corpus_fingerprint(sentences) -> str:
+    hasher = hashlib.sha1()
+    hasher.update(str(len(sentences)).encode())
+    for sentence in sentences:
+        hasher.update(sentence.encode('utf-8', 'replace'))
+        hasher.update(b'\0')
+    return hasher.hexdigest()[:16]
+
+
+def get_or_encode(name, sentences, encode_fn, cache_dir, key_extra=''):
+    """Encode ``sentences`` with ``encode_fn``, caching the result on disk.
+
+    Evaluation suites tend to re-encode the same corpora over and over:
+    several MTEB tasks share corpora within one evaluation call, and the
+    encode pass dominates their wall-time. The cache key covers the corpus
+    content and ``key_extra`` (pass something that identifies the model
+    weights, e.g. the run name plus the epoch, so that runs sharing a
+    cache directory never reuse each other's embeddings). ``key_extra``
+    is sanitized into a filename-safe slug before use. Embeddings are
+    stored in fp16 to halve the disk footprint; ranking metrics are
+    insensitive to the rounding.
+
+    An empty ``cache_dir`` disables the cache.
+    """
+    if not cache_dir:
+        return encode_fn(sentences)
+
+    digest = _corpus_fingerprint(sentences)
+    key_extra = re.sub(r'[^\w.-]', '-', str(key_extra))
+    path = os.path.join(cache_dir, f'{name}-{key_extra}-{digest}.pt')
+    if os.path.isfile(path):
+        logging.debug(f'Reusing cached embeddings from {path}')
+        return torch.load(path, map_location='cpu').float().numpy()
+
+    embeddings = encode_fn(sentences)
+    os.makedirs(cache_dir, exist_ok=True)
+    tensor = (
+        torch.from_numpy(embeddings)
+        if isinstance(embeddings, np.ndarray)
+        else embeddings
+    )
+    torch.save(tensor.half(), path)
+    return embeddings
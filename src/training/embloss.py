@@ -227,7 +227,9 @@ class CoSentLoss(nn.Module):
         for label, embedding in zip(labels, embeddings):
             all_vectors[distinct_labels[label.item()]].append(embedding)
         all_vectors = [torch.stack(group) for group in all_vectors]
-        sum_value = torch.tensor(1.0, requires_grad=True)
+        # the accumulator lives on the embeddings' device; starting from a CPU
+        # scalar would force an implicit host-to-device copy on every step
+        sum_value = torch.ones((), device=embeddings.device, requires_grad=True)
         if (
             len(all_vectors) > 1
         ):  # without negatives you can not calculate the cosent loss
@@ -251,7 +253,10 @@ class CoSentLoss(nn.Module):
                 )
                 exp_pos_sim_values = torch.exp(-pos_sim_values / self._tau)
                 exp_pos_sim_values = exp_pos_sim_values * (
-                    1 - torch.eye(exp_pos_sim_values.shape[0]).to(embeddings.device)
+                    1
+                    - torch.eye(
+                        exp_pos_sim_values.shape[0], device=embeddings.device
+                    )
                 )  # remove unwanted 1s
                 sum_value = sum_value + torch.sum(
                     exp_pos_sim_values * sum_exp_neg_sim_values
@@ -378,17 +383,28 @@ class MRLMultiCELoss(MultiCELoss):
 
     def forward(self, embeddings, scores, row_sizes):
         scores_masks = row_sizes - 1
+        # the batch is split into rows and the CE target distributions are
+        # computed once up front: neither depends on the matryoshka level,
+        # so only the truncated-dim similarities vary inside the dims loop
+        rows = []
+        for emb_row, score_row in zip(
+            self._iterate_batch(embeddings, row_sizes),
+            self._iterate_batch(scores, scores_masks),
+        ):
+            if self._beta > 0:
+                ce_scores = torch.nn.functional.softmax(torch.stack(score_row))
+            else:
+                ce_scores = None
+            rows.append((emb_row, ce_scores))
+        batch_count = len(rows)
+
         weighted_loss = 0.0
         for dim, weight in zip(self._dims, self._weights):
-            loss = None
-            batch_count = 0
+            loss = 0.0
             anchor_embeddings = []
             pos_embeddings = []
             neg_embeddings = []
-            for emb_row, score_row in zip(
-                self._iterate_batch(embeddings, row_sizes),
-                self._iterate_batch(scores, scores_masks),
-            ):
+            for emb_row, ce_scores in rows:
                 anc = emb_row[0].unsqueeze(0)[:, :dim]
                 pos = emb_row[1].unsqueeze(0)[:, :dim]
                 neg = emb_row[2:, :dim]
@@ -397,22 +413,17 @@ class MRLMultiCELoss(MultiCELoss):
                 emb_scores = torch.nn.functional.log_softmax(
                     torch.cat([pos_score, neg_scores]), dim=0
                 )
-                if self._beta > 0:
-                    ce_scores = torch.nn.functional.softmax(torch.stack(score_row))
+                if ce_scores is not None:
                     kl_loss = self._kl_loss(emb_scores, ce_scores)
                 else:
                     kl_loss = 0.0
-                if loss is None:
-                    loss = self._beta * kl_loss
-                else:
-                    loss += self._beta * kl_loss
+                loss += self._beta * kl_loss
                 if not self._single_info_nce:
                     loss += self._alpha * self._info_nce_loss(anc, pos, neg)
                 else:
                     anchor_embeddings.append(anc)
                     pos_embeddings.append(pos)
                     neg_embeddings.append(neg)
-                batch_count += 1
             loss /= batch_count
             if self._single_info_nce:
                 loss += self._alpha * self._info_nce_loss(
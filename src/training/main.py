@@ -8,7 +8,7 @@ import shutil
 import subprocess
 import sys
 from datetime import datetime
-from functools import partial
+from functools import lru_cache
 
 import numpy as np
 import torch
@@ -33,7 +33,7 @@ from open_clip import (
 )
 from open_clip.tokenizer import DEFAULT_CONTEXT_LENGTH
 
-from training.data import MultiS3EmbeddingDataset, dynamic_collate, get_multimodal_data
+from training.data import DynamicCollate, MultiS3EmbeddingDataset, get_multimodal_data
 from training.distributed import broadcast_object, init_distributed_device, is_master
 from training.eval import evaluate
 from training.fileutils import pt_load, remote_sync, start_sync_process
@@ -46,6 +46,31 @@ from training.train import train_one_epoch
 LATEST_CHECKPOINT_NAME = 'epoch_latest.pt'
 
 
+# embedding-loss classes resolved by name, filled on first use so repeated
+# dataloader constructions skip the getattr round trips and a bad loss name
+# fails with a clear message
+_emb_loss_classes = {}
+
+
+def _resolve_emb_loss_class(name):
+    import training.embloss as embeddings_loss_module
+
+    loss_cls = _emb_loss_classes.get(name)
+    if loss_cls is None:
+        loss_cls = getattr(embeddings_loss_module, name, None)
+        if loss_cls is None:
+            raise ValueError(f'Unknown embedding loss: {name}')
+        _emb_loss_classes[name] = loss_cls
+    return loss_cls
+
+
+@lru_cache(maxsize=8)
+def _load_embeddings_tokenizer(name):
+    # loaded from the hub cache and memoized: reconstructing the dataloader
+    # (e.g. on resume) must not trigger another download or re-parse
+    return AutoTokenizer.from_pretrained(name)
+
+
 def random_seed(seed=42, rank=0):
     torch.manual_seed(seed + rank)
     np.random.seed(seed + rank)
@@ -83,8 +108,6 @@ def get_latest_checkpoint(path: str, remote: bool):
 
 def create_embeddings_dataloader(args):
 
-    import training.embloss as embeddings_loss_module
-
     embeddings_dataset = None
 
     try:
@@ -95,7 +118,7 @@ def create_embeddings_dataloader(args):
     loss_init = loss_init or [{'name': 'InfoNCELoss'}]
 
     for d in loss_init:
-        d['name'] = getattr(embeddings_loss_module, d['name'])
+        d['name'] = _resolve_emb_loss_class(d['name'])
         if 'tasks' not in d:
             d['tasks'] = '*'
         if 'options' not in d:
@@ -149,13 +172,10 @@ def create_embeddings_dataloader(args):
 
     logging.info('Setting up the embedding dataloader')
 
-    embeddings_tokenizer = AutoTokenizer.from_pretrained(
-        args.emb_tokenizer_name, force_download=True
-    )
+    embeddings_tokenizer = _load_embeddings_tokenizer(args.emb_tokenizer_name)
     embeddings_dataloader = DataLoader(
         dataset=embeddings_dataset,
-        collate_fn=partial(
-            dynamic_collate,
+        collate_fn=DynamicCollate(
             tokenizer=embeddings_tokenizer,
             tokenizer_options={
                 'padding': 'max_length',
@@ -184,6 +204,7 @@ def main(args):
         # float16 and almost as accurate as float32
         # This was a default in pytorch until 1.12
         torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.allow_tf32 = True
         torch.backends.cudnn.benchmark = True
         torch.backends.cudnn.deterministic = False
 
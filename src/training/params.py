@@ -598,6 +598,20 @@ def parse_args(args):
         default='1,5',
         help='Define a comma separated list of k values.',
     )
+    parser.add_argument(
+        '--eval-sharded',
+        default=False,
+        action='store_true',
+        help='Shard the CLIP benchmark datasets across the distributed ranks '
+        'during evaluation instead of running them all on master.',
+    )
+    parser.add_argument(
+        '--eval-emb-cache-dir',
+        type=str,
+        default='',
+        help='Directory used to cache evaluation embeddings on disk. '
+        'An empty value disables the cache.',
+    )
     parser.add_argument(
         '--mteb-tasks',
         type=str,
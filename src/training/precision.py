@@ -1,13 +1,16 @@
 from contextlib import suppress
+from functools import partial
 
 import torch
 
 
-def get_autocast(precision):
+def get_autocast(precision, device_type='cuda'):
+    # the unified torch.autocast replaces the deprecated torch.cuda.amp
+    # alias and works on CPU as well
     if precision == 'amp' or precision == 'float16' or precision == 'fp16':
-        return torch.cuda.amp.autocast
+        return partial(torch.autocast, device_type=device_type)
     elif precision == 'amp_bfloat16' or precision == 'amp_bf16':
         # amp_bfloat16 is more stable than amp float16 for clip training
-        return lambda: torch.cuda.amp.autocast(dtype=torch.bfloat16)
+        return partial(torch.autocast, device_type=device_type, dtype=torch.bfloat16)
     else:
         return suppress
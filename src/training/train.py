@@ -3,6 +3,7 @@ import math
 import time
 import warnings
 from collections import defaultdict
+from collections.abc import Mapping
 from itertools import islice
 
 import torch
@@ -67,6 +68,118 @@ def backward(total_loss, model, scaler=None, deepspeed=False):
         total_loss.backward()
 
 
+def _sum_losses(values):
+    """Sum loss tensors with one reduction kernel.
+
+    Python's sum() over n tensors chains n elementwise adds (starting
+    from the int 0); stacking and reducing does it in one launch.
+    Single-entry dicts skip the stack entirely. Losses with a zero
+    weight may arrive as CPU integer sentinels (torch.tensor(0)) next
+    to CUDA floats; torch.stack rejects that mix, so fall back to the
+    builtin sum, which handles it via scalar promotion.
+    """
+    values = list(values)
+    if len(values) == 1:
+        return values[0]
+    if len({(value.device, value.dtype, value.shape) for value in values}) == 1:
+        return torch.stack(values).sum()
+    return sum(values)
+
+
+def _encode_texts(model, emb_batch):
+    """Encode all MTL text batches through the text tower in one forward.
+
+    A per-batch list comprehension launches len(emb_batch) separate tower
+    passes, each with its own Python, autograd and kernel-launch overhead.
+    The embeddings collate pads to a fixed max_length, so the token
+    tensors share a shape and one concatenated forward plus a split gives
+    the same features with a single set of launches; if the shapes ever
+    diverge, fall back to per-batch calls.
+    """
+    module = (
+        model.module
+        if isinstance(model, nn.parallel.DistributedDataParallel)
+        else model
+    )
+    if (
+        len(emb_batch) > 1
+        and len({batch['input_ids'].shape[1] for batch in emb_batch}) == 1
+    ):
+        sizes = [batch['input_ids'].shape[0] for batch in emb_batch]
+        ids = torch.cat([batch['input_ids'] for batch in emb_batch], dim=0)
+        return list(module.encode_text(ids, normalize=True).split(sizes, dim=0))
+    return [
+        module.encode_text(batch['input_ids'], normalize=True)
+        for batch in emb_batch
+    ]
+
+
+def _to_device(tensor, device, dtype=None, non_blocking=True):
+    """Move a tensor unless it already sits on the target device and dtype.
+
+    torch.Tensor.to returns self for a no-op move, but only after going
+    through full dispatch; checking first keeps CPU runs and already-
+    placed batches from paying that cost for every tensor per step.
+    """
+    if tensor.device == device and (dtype is None or tensor.dtype == dtype):
+        return tensor
+    return tensor.to(device=device, dtype=dtype, non_blocking=non_blocking)
+
+
+def _record_stream(item, stream):
+    """Mark every tensor in a (possibly nested) batch as used by a stream."""
+    if isinstance(item, torch.Tensor):
+        item.record_stream(stream)
+    elif isinstance(item, Mapping):
+        for value in item.values():
+            _record_stream(value, stream)
+    elif isinstance(item, (list, tuple)):
+        for value in item:
+            _record_stream(value, stream)
+
+
+class _CUDAPrefetcher:
+    """Copy the next batch to the GPU on a side stream while the current
+    one trains.
+
+    The dataloaders pin their host memory, but the host-to-device copies
+    still run on the compute stream, so each step starts by waiting for
+    its own transfers. Staging the copies for batch i + 1 on a dedicated
+    stream overlaps them with the forward and backward of batch i.
+    Yielded tensors are registered with the compute stream via
+    record_stream so the caching allocator does not hand their memory
+    back to the copy stream while kernels still read it.
+    """
+
+    def __init__(self, batches, move_batch):
+        self._batches = iter(batches)
+        self._move_batch = move_batch
+        self._stream = torch.cuda.Stream()
+        self._next = None
+        self._preload()
+
+    def _preload(self):
+        try:
+            batch = next(self._batches)
+        except StopIteration:
+            self._next = None
+            return
+        with torch.cuda.stream(self._stream):
+            self._next = self._move_batch(batch)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._next is None:
+            raise StopIteration
+        torch.cuda.current_stream().wait_stream(self._stream)
+        batch = self._next
+        _record_stream(batch, torch.cuda.current_stream())
+        self._preload()
+        return batch
+
+
 class DummyEmbeddingsDataloader:
 
     def __iter__(self):
@@ -108,7 +221,8 @@ def train_one_epoch(
     data['train'].set_epoch(epoch)
     dataloader = data['train'].dataloader
     num_batches_per_epoch = dataloader.num_batches // args.accum_freq
-    sample_digits = math.ceil(math.log(dataloader.num_samples + 1, 10))
+    samples_per_epoch = dataloader.num_samples
+    sample_digits = math.ceil(math.log(samples_per_epoch + 1, 10))
 
     accum_images, accum_texts, accum_features = [], [], {}
     accum_emb_datasets, accum_emb_batches, accum_emb_labels, accum_embeddings = (
@@ -127,27 +241,63 @@ def train_one_epoch(
             world_size=args.world_size,
         )
 
+    def _move_batch(batch):
+        mm_batch, (emb_dataset, (emb_batch, emb_labels)) = batch
+        images, texts = mm_batch
+        images = _to_device(images, device, dtype=input_dtype)
+        texts = _to_device(texts, device)
+        if emb_batch:
+            # move the encodings tensor-by-tensor: BatchEncoding.to does not
+            # forward non_blocking, which serializes these H2D copies behind
+            # the image transfer instead of overlapping them
+            for encoding in emb_batch:
+                for key, value in encoding.items():
+                    encoding[key] = _to_device(value, device)
+        if emb_labels:
+            emb_labels[0] = [
+                _to_device(label, device) for label in emb_labels[0]
+            ]
+        return (images, texts), (emb_dataset, (emb_batch, emb_labels))
+
+    # bind the backward flavor once instead of re-testing scaler/deepspeed
+    # on every microbatch
+    if scaler is not None:
+        def _backward(total_loss):
+            scaler.scale(total_loss).backward()
+    elif args.deepspeed:
+        def _backward(total_loss):
+            model.backward(total_loss)
+    else:
+        def _backward(total_loss):
+            total_loss.backward()
+
+    # resolved once: the model wrapper and ln(100) do not change per step
+    logit_scale_param = unwrap_model(model).logit_scale
+    logit_scale_max = math.log(100)
+
+    batches = zip(dataloader, islice(emb_dataloader, 1, None))
+    if device.type == 'cuda':
+        batches = _CUDAPrefetcher(batches, _move_batch)
+    else:
+        batches = map(_move_batch, batches)
+
+    # refreshed whenever the scheduler runs; saves digging through
+    # param_groups on every log step
+    last_layer_lr = optimizer.param_groups[-1]['lr']
+
     start = time.time()
 
     # training loop
-    for i, (mm_batch, (emb_dataset, (emb_batch, emb_labels))) in enumerate(zip(
-        dataloader, islice(emb_dataloader, 1, None)
-    )):
+    for i, (
+        (images, texts), (emb_dataset, (emb_batch, emb_labels))
+    ) in enumerate(batches):
 
         i_accum = i // args.accum_freq
         step = num_batches_per_epoch * epoch + i_accum
 
         if not args.skip_scheduler:
             scheduler(step)
-
-        images, texts = mm_batch
-        images = images.to(device=device, dtype=input_dtype, non_blocking=True)
-        texts = texts.to(device=device, non_blocking=True)
-        if emb_batch:
-            for batch in emb_batch:
-                batch.to(device=device)
-        if emb_labels:
-            emb_labels[0] = [label.to(device=device) for label in emb_labels[0]]
+            last_layer_lr = optimizer.param_groups[-1]['lr']
 
         data_time_m.update(time.time() - start)
 
@@ -155,7 +305,7 @@ def train_one_epoch(
             model.zero_grad()
             model.micro_steps = 0
         else:
-            optimizer.zero_grad()
+            optimizer.zero_grad(set_to_none=True)
 
         if args.accum_freq == 1:
 
@@ -178,16 +328,7 @@ def train_one_epoch(
                         emb_losses[emb_dataset]
                         if emb_dataset in emb_losses else emb_losses['*']
                     )
-                    embeddings = [
-                        model.module.encode_text(
-                            embedding['input_ids'], normalize=True
-                        )
-                        if isinstance(model, nn.parallel.DistributedDataParallel)
-                        else model.encode_text(
-                            embedding['input_ids'], normalize=True
-                        )
-                        for embedding in emb_batch
-                    ]
+                    embeddings = _encode_texts(model, emb_batch)
                     if args.emb_global_batch:
                         assert len(emb_labels) == 0, (
                             'Global batch cannot be used in conjunction with labeled '
@@ -200,9 +341,9 @@ def train_one_epoch(
 
                     losses['embedding_loss'] = args.emb_loss_weight * embedding_loss
 
-            total_loss = sum(losses.values())
+            total_loss = _sum_losses(losses.values())
             losses['loss'] = total_loss
-            backward(total_loss, model, scaler=scaler, deepspeed=args.deepspeed)
+            _backward(total_loss)
 
         else:
 
@@ -225,16 +366,7 @@ def train_one_epoch(
                     if args.mtl:
                         # if we have no labels == pair training
                         if len(emb_labels) == 0:
-                            embeddings = [
-                                model.module.encode_text(
-                                    embedding['input_ids'], normalize=True
-                                )
-                                if isinstance(model, nn.parallel.DistributedDataParallel)
-                                else model.encode_text(
-                                    embedding['input_ids'], normalize=True
-                                )
-                                for embedding in emb_batch
-                            ]
+                            embeddings = _encode_texts(model, emb_batch)
                             accum_embeddings.append(embeddings)
                         # else == triplet training
                         else:
@@ -275,9 +407,20 @@ def train_one_epoch(
                 model.zero_grad()
                 model.micro_steps = 0
             else:
-                optimizer.zero_grad()
-
-            losses = defaultdict(lambda: torch.zeros(1, device=device))
+                optimizer.zero_grad(set_to_none=True)
+
+            # logging-only accumulators: start from 0.0 rather than a
+            # preallocated GPU tensor, and add detached values so the
+            # autograd graph of each microbatch is released right after
+            # its backward instead of being pinned until the log step
+            losses = defaultdict(float)
+
+            # the transposed cache is invariant across microbatches; the
+            # per-k torch.cat stays inside the loop because slot k must be
+            # the live, grad-tracking tensor
+            cached_embeddings = (
+                list(zip(*accum_embeddings)) if accum_embeddings else []
+            )
 
             for k in range(args.accum_freq):
                 with autocast():
@@ -304,8 +447,8 @@ def train_one_epoch(
                     _losses = loss(**inputs, **inputs_no_accum, output_dict=True)
                     del inputs
                     del inputs_no_accum
-                    contrastive_loss = sum(_losses.values())
-                    losses['contrastive_loss'] += contrastive_loss
+                    contrastive_loss = _sum_losses(_losses.values())
+                    losses['contrastive_loss'] += contrastive_loss.detach()
                     total_loss = contrastive_loss
 
                     if args.mtl:
@@ -315,21 +458,11 @@ def train_one_epoch(
                             emb_losses[emb_dataset]
                             if emb_dataset in emb_losses else emb_losses['*']
                         )
-                        embeddings = [
-                            model.module.encode_text(
-                                embedding['input_ids'], normalize=True
-                            )
-                            if isinstance(model, nn.parallel.DistributedDataParallel)
-                            else model.encode_text(
-                                embedding['input_ids'], normalize=True
-                            )
-                            for embedding in emb_batch
-                        ]
+                        embeddings = _encode_texts(model, emb_batch)
 
                         if len(accum_emb_labels) == 0:
                             inputs = []
-                            _cached_embeddings = list(zip(*accum_embeddings))
-                            for idx, _cached_embedding in enumerate(_cached_embeddings):
+                            for idx, _cached_embedding in enumerate(cached_embeddings):
                                 inputs.append(
                                     torch.cat(
                                         _cached_embedding[:k] +
@@ -359,15 +492,23 @@ def train_one_epoch(
                             embedding_loss = emb_loss_fn(*embeddings, *emb_labels)
 
                         embedding_loss = args.emb_loss_weight * embedding_loss
-                        losses['embedding_loss'] += embedding_loss
+                        losses['embedding_loss'] += embedding_loss.detach()
                         total_loss += embedding_loss
 
-                losses['loss'] += total_loss
-                backward(total_loss, model, scaler=scaler, deepspeed=args.deepspeed)
+                losses['loss'] += total_loss.detach()
+                _backward(total_loss)
 
-            losses['contrastive_loss'] = losses['contrastive_loss'] / args.accum_freq
-            losses['embedding_loss'] = losses['embedding_loss'] / args.accum_freq
-            losses['loss'] = losses['loss'] / args.accum_freq
+            # normalize all logging sums with one fused kernel instead of
+            # launching a division per key; align device and dtype first,
+            # since zero-weight losses can be CPU integer sentinels
+            keys = list(losses.keys())
+            scaled = torch.stack(
+                [
+                    losses[key].to(device=device, dtype=torch.float32)
+                    for key in keys
+                ]
+            ) * (1.0 / args.accum_freq)
+            losses.update(zip(keys, scaled.unbind()))
 
         if scaler is not None:
             if args.horovod:
@@ -408,7 +549,7 @@ def train_one_epoch(
 
         # Note: we clamp to 4.6052 = ln(100), as in the original paper.
         with torch.no_grad():
-            unwrap_model(model).logit_scale.clamp_(0, math.log(100))
+            logit_scale_param.clamp_(0, logit_scale_max)
 
         batch_time_m.update(time.time() - start)
         start = time.time()
@@ -420,23 +561,34 @@ def train_one_epoch(
         ):
             batch_size = len(images)
             num_samples = batch_count * batch_size * args.accum_freq * args.world_size
-            samples_per_epoch = dataloader.num_samples
             percent_complete = 100.0 * batch_count / num_batches_per_epoch
 
             # NOTE loss is coarsely sampled, just master node and per log update
-            for key, val in losses.items():
+            # stack everything we log into one tensor so a single .tolist()
+            # replaces one GPU sync per loss plus one for the logit scale;
+            # zero-weight losses can live on the CPU, so align devices on
+            # the way in
+            scalars = [
+                val.detach().reshape(()).float().to(logit_scale.device)
+                for val in losses.values()
+            ]
+            scalars.append(logit_scale.detach().reshape(()).float())
+            scalars = torch.stack(scalars).tolist()
+            logit_scale_scalar = scalars.pop()
+            for key, val in zip(losses.keys(), scalars):
                 if key not in losses_m:
                     losses_m[key] = AverageMeter()
-                losses_m[key].update(val.item(), batch_size)
-
-            logit_scale_scalar = logit_scale.item()
-            loss_log = ' - '.join(
-                [
+                losses_m[key].update(val, batch_size)
+            # build the log line and the logger payload in the same pass
+            loss_log_parts = []
+            loss_values = {}
+            for loss_name, loss_m in losses_m.items():
+                loss_log_parts.append(
                     f'{loss_name.replace("_", " ")}: '
                     f'{loss_m.val:#.5g} (avg {loss_m.avg:#.5g})'
-                    for loss_name, loss_m in losses_m.items()
-                ]
-            )
+                )
+                loss_values[loss_name] = loss_m.val
+            loss_log = ' - '.join(loss_log_parts)
             samples_per_second = (
                 args.accum_freq * args.batch_size * args.world_size / batch_time_m.val
             )
@@ -450,7 +602,7 @@ def train_one_epoch(
                 f'Batch Time: {batch_time_m.avg:.3f}s - '
                 f'Samples per Second: {samples_per_second:#g}/s, '
                 f'{samples_per_second_per_gpu:#g}/s/gpu - '
-                f'Last Layer LR: {optimizer.param_groups[-1]["lr"]:5f} - '
+                f'Last Layer LR: {last_layer_lr:5f} - '
                 f'Logit Scale: {logit_scale_scalar:.3f} - '
                 f'LOSS | {loss_log}'
             )
@@ -470,7 +622,7 @@ def train_one_epoch(
                     for pgroup in optimizer.param_groups
                 }
             )
-            logdata.update({name: val.val for name, val in losses_m.items()})
+            logdata.update(loss_values)
 
             logdata = {'train/' + name: val for name, val in logdata.items()}
 
@@ -0,0 +1,146 @@
+import os
+
+import pytest
+import torch
+import torch.nn.functional as F
+from open_clip.loss import (
+    ClipLoss,
+    SigLipLoss,
+    _distill_loss,
+    _siglip_loss,
+    _symmetric_cross_entropy,
+)
+
+os.environ['CUDA_VISIBLE_DEVICES'] = ''
+
+
+def _random_features(num_samples=16, dim=8, seed=0):
+    generator = torch.Generator().manual_seed(seed)
+    image_features = torch.randn(num_samples, dim, generator=generator)
+    text_features = torch.randn(num_samples, dim, generator=generator)
+    return (
+        F.normalize(image_features, dim=-1),
+        F.normalize(text_features, dim=-1),
+    )
+
+
+def _baseline_siglip_loss(logits, negative_only=False):
+    # the textbook formulation with an explicit {-1, +1} label matrix
+    labels = -torch.ones_like(logits)
+    if not negative_only:
+        labels.fill_diagonal_(1)
+    return -F.logsigmoid(labels * logits).sum() / logits.shape[0]
+
+
+def test_symmetric_cross_entropy_matches_two_cross_entropies():
+    generator = torch.Generator().manual_seed(0)
+    logits = torch.randn(16, 16, generator=generator)
+    labels = torch.arange(16)
+    baseline = (
+        F.cross_entropy(logits, labels) + F.cross_entropy(logits.t(), labels)
+    ) / 2
+    torch.testing.assert_close(
+        _symmetric_cross_entropy(logits), baseline, rtol=1e-4, atol=1e-5
+    )
+
+
+def test_clip_loss_matches_baseline():
+    image_features, text_features = _random_features()
+    logit_scale = torch.tensor(10.0)
+    loss = ClipLoss()(image_features, text_features, logit_scale)
+
+    logits = logit_scale * image_features @ text_features.t()
+    labels = torch.arange(logits.shape[0])
+    baseline = (
+        F.cross_entropy(logits, labels) + F.cross_entropy(logits.t(), labels)
+    ) / 2
+    torch.testing.assert_close(loss, baseline, rtol=1e-4, atol=1e-5)
+
+
+def test_local_loss_labels_match_global_formulation():
+    # the local-loss branch scores each rank's rows of the global logits
+    # against rank-offset labels; averaged over ranks that must equal the
+    # full-matrix cross entropy with plain arange labels
+    world_size, num_local = 4, 8
+    image_features, text_features = _random_features(world_size * num_local)
+    logits = 10.0 * image_features @ text_features.t()
+
+    global_loss = F.cross_entropy(logits, torch.arange(logits.shape[0]))
+    rank_losses = []
+    for rank in range(world_size):
+        loss_fn = ClipLoss(local_loss=True, rank=rank, world_size=world_size)
+        labels = loss_fn.get_ground_truth(logits.device, num_local)
+        rows = logits[rank * num_local:(rank + 1) * num_local]
+        rank_losses.append(F.cross_entropy(rows, labels))
+    torch.testing.assert_close(
+        torch.stack(rank_losses).mean(), global_loss, rtol=1e-4, atol=1e-5
+    )
+
+
+@pytest.mark.parametrize('negative_only', [False, True])
+@pytest.mark.parametrize('use_bias', [False, True])
+def test_siglip_loss_matches_logsigmoid_baseline(negative_only, use_bias):
+    image_features, text_features = _random_features()
+    logit_scale = torch.tensor(10.0)
+    logit_bias = torch.tensor(-8.0) if use_bias else None
+
+    loss = _siglip_loss(
+        logit_scale * image_features, text_features, logit_bias, negative_only
+    )
+
+    logits = logit_scale * image_features @ text_features.t()
+    if logit_bias is not None:
+        logits = logits + logit_bias
+    baseline = _baseline_siglip_loss(logits, negative_only=negative_only)
+    torch.testing.assert_close(loss, baseline, rtol=1e-4, atol=1e-5)
+
+
+def test_siglip_loss_module_matches_baseline():
+    image_features, text_features = _random_features()
+    logit_scale = torch.tensor(10.0)
+    logit_bias = torch.tensor(-8.0)
+    loss = SigLipLoss()(image_features, text_features, logit_scale, logit_bias)
+
+    logits = logit_scale * image_features @ text_features.t() + logit_bias
+    baseline = _baseline_siglip_loss(logits)
+    torch.testing.assert_close(loss, baseline, rtol=1e-4, atol=1e-5)
+
+
+def test_batched_negative_loss_matches_streamed_shards():
+    image_features, text_features = _random_features()
+    logit_scale = torch.tensor(10.0)
+    logit_bias = torch.tensor(-8.0)
+    scaled_image_features = logit_scale * image_features
+    generator = torch.Generator().manual_seed(1)
+    shards = [
+        F.normalize(
+            torch.randn(*text_features.shape, generator=generator), dim=-1
+        )
+        for _ in range(3)
+    ]
+
+    batched = SigLipLoss()._batched_negative_loss(
+        scaled_image_features, shards, logit_bias
+    )
+    streamed = sum(
+        _siglip_loss(scaled_image_features, shard, logit_bias, negative_only=True)
+        for shard in shards
+    )
+    torch.testing.assert_close(batched, streamed, rtol=1e-4, atol=1e-5)
+
+
+def test_distill_loss_matches_soft_cross_entropy():
+    generator = torch.Generator().manual_seed(0)
+    teacher_logits = torch.randn(16, 16, generator=generator)
+    student_logits = torch.randn(16, 16, generator=generator)
+    baseline = (
+        -(
+            teacher_logits.softmax(dim=1) * student_logits.log_softmax(dim=1)
+        ).sum(dim=1).mean()
+    )
+    torch.testing.assert_close(
+        _distill_loss(teacher_logits, student_logits),
+        baseline,
+        rtol=1e-4,
+        atol=1e-5,
+    )